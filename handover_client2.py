@@ -1,42 +1,77 @@
 # handover_client.py
+import os
+import random
 import socket
 import sys
+import threading
 import time
 import json
 
+# orjson serializes faster and returns bytes directly; fall back to the stdlib when it is not installed,
+# producing the same compact UTF-8 encoding
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
 # Replace with the server's IP address and port
 HOST = '127.0.0.1'  # The server's IP address
 PORT = 54321        # The port used by the server
 
-def create_connection(host, port, retries=5, delay=2):
-    """Attempts to create a socket connection to the server, with retries."""
+# Queued handovers are flushed as soon as this many are pending, and at least once per flush interval
+BATCH_SIZE = int(os.environ.get("HANDOVER_BATCH_SIZE", 100))
+FLUSH_INTERVAL_MS = int(os.environ.get("HANDOVER_FLUSH_INTERVAL_MS", 100))
+
+# Largest number of buffers a single sendmsg call may take on Linux
+IOV_MAX = 1024
+
+def create_connection(host, port, retries=5, delay=2, max_delay=30):
+    """Attempts to create a socket connection to the server, retrying with exponential backoff."""
     attempt = 0
     while attempt < retries:
+        s = None
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Handover commands are small frames; disable Nagle so they are not delayed
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             s.connect((host, port))
             print(f"Successfully connected to the server {host} on port {port}")
             return s
         except socket.error as err:
-            print(f"Connection failed with error: {err}. Retrying in {delay} seconds...")
-            time.sleep(delay)
+            if s:
+                s.close()
             attempt += 1
+            if attempt == retries:
+                # No retry follows the last attempt, so don't wait
+                print(f"Connection failed with error: {err}.")
+                break
+            # Double the wait after each failure, up to max_delay, with jitter so clients don't retry in lockstep
+            wait = min(max_delay, delay * 2 ** (attempt - 1)) * (0.5 + random.random())
+            print(f"Connection failed with error: {err}. Retrying in {wait:.1f} seconds...")
+            time.sleep(wait)
     print("Maximum retries reached. Failed to connect to the server.")
     return None
 
+def build_handover_command(ue_id, target_enb_id):
+    """Returns the handover command for one UE as JSON encoded bytes."""
+    command = {
+        "message_id": "some_unique_id",  # You need to generate a unique ID for each message
+        "command": "handover",
+        "parameters": {
+            "ue_id": ue_id,
+            "target_enb_id": target_enb_id
+        }
+    }
+    return dumps(command)
+
 def send_handover_command(sock, ue_id, target_enb_id):
     try:
-        # Construct the handover command as a JSON formatted string
-        command = {
-            "message_id": "some_unique_id",  # You need to generate a unique ID for each message
-            "command": "handover",
-            "parameters": {
-                "ue_id": ue_id,
-                "target_enb_id": target_enb_id
-            }
-        }
-        message = json.dumps(command) + "\n"
-        sock.sendall(message.encode())
+        message = build_handover_command(ue_id, target_enb_id) + b"\n"
+        sock.sendall(message)
 
         # Wait for a response from the server
         response = sock.recv(1024)
@@ -50,9 +85,207 @@ def send_handover_command(sock, ue_id, target_enb_id):
         return False
     return True
 
+def sendall_iov(sock, buffers):
+    """Writes all buffers with scatter/gather sendmsg so they are never joined into one copy."""
+    if not hasattr(sock, "sendmsg"):
+        # Windows sockets have no sendmsg
+        sock.sendall(b"".join(buffers))
+        return
+    views = [memoryview(b) for b in buffers if b]
+    i = 0
+    while i < len(views):
+        sent = sock.sendmsg(views[i:i + IOV_MAX])
+        # Skip the buffers the kernel took and trim a partially sent one
+        while sent:
+            n = len(views[i])
+            if sent >= n:
+                sent -= n
+                i += 1
+            else:
+                views[i] = views[i][sent:]
+                sent = 0
+
+def send_handover_batch(sock, items):
+    """Sends several (ue_id, target_enb_id) handovers in one write and returns how many the server acknowledged."""
+    acked = 0
+    if not items:
+        return acked
+    try:
+        iov = []
+        for ue_id, target_enb_id in items:
+            iov.append(build_handover_command(ue_id, target_enb_id))
+            iov.append(b"\n")
+        sendall_iov(sock, iov)
+
+        # The server answers each newline-delimited command with its own line
+        with sock.makefile('rb') as reader:
+            for _ in items:
+                response = reader.readline()
+                if not response:
+                    print("Connection was closed by the server.")
+                    break
+                print("Server response:", response.decode().rstrip("\n"))
+                acked += 1
+
+    except socket.error as err:
+        print(f"Batch send/receive failed with error: {err}.")
+    return acked
+
+class HandoverClient:
+    """Keeps one persistent connection to the handover server and reconnects on failure.
+
+    Delivery is at most once: a command that was written is never resent, since the server
+    may already have acted on it. Only queued commands that were never written are retried.
+    """
+
+    def __init__(self, host=HOST, port=PORT, retries=5, delay=2, batch_size=BATCH_SIZE, flush_interval_ms=FLUSH_INTERVAL_MS):
+        self.host = host
+        self.port = port
+        self.retries = retries
+        self.delay = delay
+        # A batch size of 0 keeps its old meaning of flushing on every enqueue
+        self.batch_size = max(1, batch_size)
+        # A zero or negative interval would make the flusher spin; wait at least 1 ms
+        self.flush_interval_ms = max(1, flush_interval_ms)
+        self.sock = None
+        self._send_lock = threading.Lock()
+        self._buf = []
+        self._buf_lock = threading.Lock()
+        # Serializes whole flushes so the final flush in stop_flusher() runs after one already in progress
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = None
+        # Set by close(); stops senders still running from opening a new connection
+        self._closed = False
+
+    def connect(self):
+        self._closed = False
+        self.sock = create_connection(self.host, self.port, self.retries, self.delay)
+        return self.sock is not None
+
+    def _connect_unless_closed(self):
+        """Connects unless close() has been called. Call with _send_lock held."""
+        if self._closed:
+            return False
+        return self.connect()
+
+    def _reconnect(self):
+        """Replaces a failed connection. Call with _send_lock held."""
+        print("Attempting to reconnect to the server...")
+        self._close_socket()  # Close the previous socket before creating a new one
+        if not self._connect_unless_closed():
+            print("Reconnection failed.")
+            return False
+        return True
+
+    def send(self, ue_id, target_enb_id):
+        """Sends a handover command, reconnecting on failure.
+
+        A failed command is not resent: the server may already have acted on it.
+        Returns False when the command failed; sock is None afterwards if reconnecting failed too.
+        """
+        with self._send_lock:
+            if self.sock is None and not self._connect_unless_closed():
+                return False
+            if send_handover_command(self.sock, ue_id, target_enb_id):
+                return True
+            self._reconnect()
+            return False
+
+    def _send_chunk(self, items):
+        """Sends one batch and returns (written, acked); written is False if no connection could be made."""
+        with self._send_lock:
+            if self.sock is None and not self._connect_unless_closed():
+                return False, 0
+            acked = send_handover_batch(self.sock, items)
+            if acked < len(items):
+                # The unacknowledged commands are not resent, only the connection is replaced
+                self._reconnect()
+            return True, acked
+
+    def send_batch(self, items):
+        """Sends a list of (ue_id, target_enb_id) handovers and returns how many were acknowledged.
+
+        If the connection drops it is re-established, but unacknowledged commands are not resent.
+        """
+        return self._send_chunk(items)[1]
+
+    def enqueue(self, ue_id, target_enb_id):
+        """Queues a handover for the background flusher started by start_flusher()."""
+        with self._buf_lock:
+            self._buf.append((ue_id, target_enb_id))
+            full = len(self._buf) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Sends every queued handover, at most batch_size commands per write.
+
+        On failure, the handovers that were never written go back to the front of the queue and False is returned.
+        """
+        with self._flush_lock:
+            with self._buf_lock:
+                items, self._buf = self._buf, []
+            # Bound each write so a large backlog doesn't become one huge send the server must absorb before replying
+            for i in range(0, len(items), self.batch_size):
+                chunk = items[i:i + self.batch_size]
+                written, acked = self._send_chunk(chunk)
+                if acked < len(chunk):
+                    # Stop at the first failure rather than running a reconnect cycle for every remaining chunk.
+                    # A written chunk is not requeued, even the unacknowledged part of it.
+                    with self._buf_lock:
+                        self._buf[:0] = items[i + len(chunk) if written else i:]
+                    return False
+            return True
+
+    def start_flusher(self):
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="handover-flush", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self, timeout=5):
+        """Stops the background flusher and sends whatever is still queued; returns False if some could not be sent."""
+        stopped = True
+        if self._flusher:
+            self._stop.set()
+            self._wake.set()
+            self._flusher.join(timeout)
+            # A flusher still alive may be mid-reconnect; its handovers are not known to be delivered
+            stopped = not self._flusher.is_alive()
+            self._flusher = None
+        return self.flush() and stopped
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            # Wake early when a full batch is waiting or on stop, otherwise flush once per interval
+            self._wake.wait(self.flush_interval_ms / 1000)
+            self._wake.clear()
+            if not self.flush():
+                with self._buf_lock:
+                    pending = len(self._buf)
+                if self._stop.is_set():
+                    # No further attempt follows; stop_flusher() makes the last one
+                    print(f"Handover flush failed; {pending} handovers remain queued.")
+                else:
+                    print(f"Handover flush failed; {pending} handovers remain queued for the next attempt.")
+
+    def _close_socket(self):
+        """Closes the current socket. Call with _send_lock held."""
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+    def close(self):
+        self.stop_flusher()
+        # A flusher that outlived the join may still be mid-send or reconnecting; wait for it before closing
+        with self._send_lock:
+            self._closed = True
+            self._close_socket()
+
 def main():
-    sock = create_connection(HOST, PORT)
-    if not sock:
+    client = HandoverClient(HOST, PORT)
+    if not client.connect():
         print("Failed to connect to the server. Exiting.")
         sys.exit(1)
 
@@ -61,14 +294,11 @@ def main():
             # Example UE ID and target eNB ID for handover
             ue_id = '123'
             target_enb_id = '456'
-            
-            if not send_handover_command(sock, ue_id, target_enb_id):
-                print("Attempting to reconnect to the server...")
-                sock.close()  # Close the previous socket before creating a new one
-                sock = create_connection(HOST, PORT)
-                if not sock:
-                    print("Reconnection failed. Exiting.")
-                    break
+
+            # A failed send has already reconnected; only give up when that failed as well
+            if not client.send(ue_id, target_enb_id) and client.sock is None:
+                print("Reconnection failed. Exiting.")
+                break
 
             # Example delay between handover commands
             time.sleep(5)
@@ -76,8 +306,7 @@ def main():
     except KeyboardInterrupt:
         print("Interrupted by the user.")
     finally:
-        if sock:
-            sock.close()  # Ensure the socket is closed on exit
+        client.close()  # Ensure the socket is closed on exit
 
 if __name__ == '__main__':
     main()
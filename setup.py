@@ -28,7 +28,9 @@ setup(
         "influxdb", 
         "numpy", 
         "influxdb-client",
-        "flask"
+        "flask",
+        "waitress",
+        "orjson"
     ],
     python_requires='==3.11',  
     entry_points={
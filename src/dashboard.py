@@ -4,8 +4,6 @@ import time
 import requests
 import logging
 
-time.sleep(10)
-
 dashboard_app = Flask(__name__)
 
 # Secret key for flashing messages and session management
@@ -44,5 +42,7 @@ def trigger_function(function_name):
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
+    # Give the ts-xApp API time to come up before serving the dashboard
+    time.sleep(10)
     logging.info("Dashboard starting...")
     dashboard_app.run(host='0.0.0.0', port=5001)  # Adjust port if needed
@@ -3,24 +3,41 @@
 #data_sync.py
 from influxdb import DataFrameClient
 import logging
+import threading
+
+# InfluxDB settings for the kpimon database
+KPIMON_DBNAME = 'kpimon'  # Connect to the 'kpimon' database
+KPIMON_HOST = 'ricplt-influxdb.ricplt.svc.cluster.local'  # Updated to use the full DNS name within the Kubernetes cluster
+KPIMON_PORT = '8086'
+
+# Shared kpimon connection, reused across sync requests
+kpimon_db = None
+kpimon_db_lock = threading.Lock()
 
 class DATABASE(object):
     def __init__(self, dbname, host='localhost', port='8086'):
         self.dbname = dbname  # Define the database name as an instance variable
-        self.client = DataFrameClient(host, port, dbname)
+        # gzip compresses query/write payloads
+        self.client = DataFrameClient(host, port, database=dbname, gzip=True)
+
+def get_kpimon_db():
+    """
+    Return the shared DATABASE instance for kpimon, creating it on first use.
+    """
+    global kpimon_db
+    with kpimon_db_lock:
+        if kpimon_db is None:
+            kpimon_db = DATABASE(KPIMON_DBNAME, KPIMON_HOST, KPIMON_PORT)
+        return kpimon_db
 
 def sync_kpimon_data():
     print("sync_kpimon_data endpoint called")
     try:
-        # Specify your InfluxDB settings
-        dbname = 'kpimon'  # Connect to the 'kpimon' database
-        host = 'ricplt-influxdb.ricplt.svc.cluster.local'  # Updated to use the full DNS name within the Kubernetes cluster
-        port = '8086'
-
-        # Create an instance of the DATABASE class
-        db = DATABASE(dbname, host, port)
+        db = get_kpimon_db()
 
         # Log a message
-        logging.info(f"Connected to the '{dbname}' database in InfluxDB at {host}:{port}")
+        logging.info(f"Connected to the '{db.dbname}' database in InfluxDB at {KPIMON_HOST}:{KPIMON_PORT}")
     except Exception as e:
-        logging.error(f"Error connecting to the '{dbname}' database in InfluxDB: {str(e)}")
+        logging.error(f"Error connecting to the '{KPIMON_DBNAME}' database in InfluxDB: {str(e)}")
+        # Let callers see the failure instead of reporting a completed sync
+        raise
@@ -25,11 +25,12 @@ def default_rmr_handler(summary, sbuf):
     msg_state = summary.get('state', 'Unknown')
     transaction_id = summary.get('xid', 'Unknown')
 
-    logging.info(f"Received RMR message - Type: {msg_type}, State: {msg_state}, Transaction ID: {transaction_id}")
+    # Arguments are formatted lazily, only if INFO is enabled
+    logging.info("Received RMR message - Type: %s, State: %s, Transaction ID: %s", msg_type, msg_state, transaction_id)
 
-    # Accessing and logging the payload of the message
-    payload = sbuf.get_payload()
-    logging.info(f"Message payload: {payload}")
+    # Accessing and logging the payload of the message, skipped when INFO is disabled
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        logging.info("Message payload: %s", sbuf.get_payload())
 
     # You can now use the subscription_manager here if needed
     if subscription_manager is not None:
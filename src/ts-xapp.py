@@ -6,8 +6,10 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 import logging
 from flask import Flask, jsonify
+from waitress import serve
 import subprocess
 import signal
+import threading
 from ricxappframe.xapp_frame import RMRXapp
 from subscription_manager import SubscriptionManager
 import default_handler
@@ -20,53 +22,44 @@ from A1PolicyHandler import A1PolicyHandler
 from A1PolicyManager import A1PolicyManager
 from A1_health_check import A1HealthCheck
 from constants import Constants
-
-# Initialize the app and set environment variables
 from init_app import init_app
-init_app()
-
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s:%(levelname)s:%(message)s',
-    handlers=[
-        logging.FileHandler('ts-xapp.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# Create an RMR xApp instance
-rmr_xapp = RMRXapp(default_handler.default_rmr_handler, rmr_port=int(os.environ.get("RMR_PORT", 4560)))
-
-# Initialize A1PolicyManager and A1PolicyHandler
-a1_policy_manager = A1PolicyManager(rmr_xapp)
-a1_policy_handler = A1PolicyHandler(rmr_xapp)
-# Initialize the A1 health check handler
-a1_health_check_handler = A1HealthCheck(rmr_xapp)
-# Startup A1PolicyManager
-a1_policy_manager.startup()
-
-# Provide the correct URI for the Subscription Manager
-subscription_manager_uri = "http://10.244.0.18:3800/"
-
-# Create an instance of the SubscriptionManager
-subscription_manager = SubscriptionManager(uri=subscription_manager_uri, local_address="0.0.0.0", local_port=8088)
-
-# Set the SubscriptionManager in default_handler
-default_handler.set_subscription_manager(subscription_manager)
+
+# RMR xApp and the handlers built on it, created in main()
+rmr_xapp = None
+a1_policy_manager = None
+a1_policy_handler = None
+a1_health_check = None
+subscription_manager = None
+dashboard_process = None
 
 ts_app = Flask(__name__)
 
+# Set when a KPImon sync is requested; a background worker runs it so the
+# HTTP handler does not block on the InfluxDB connection. Requests made
+# before the worker picks the flag up are all served by the same sync.
+sync_requested = threading.Event()
+# Set on shutdown to stop the worker
+sync_stop = threading.Event()
+
+def sync_worker():
+    while not sync_stop.is_set():
+        if not sync_requested.wait(timeout=0.5):
+            continue
+        sync_requested.clear()
+        try:
+            sync_kpimon_data()
+            logging.info("Data synchronization with KPImon completed")
+        except Exception as e:
+            logging.error(f"Error syncing data with KPImon: {str(e)}")
+
+sync_thread = threading.Thread(target=sync_worker, name="sync-kpimon", daemon=True)
+
 @ts_app.route('/sync_kpimon', methods=['POST'])
 def run_sync_kpimon_data():
     print("Sync KPI Mon Data endpoint called")
-    try:
-        sync_kpimon_data()
-        logging.info("Data synchronization with KPImon initiated successfully")
-        return jsonify(message="Data synchronization with KPImon initiated successfully")
-    except Exception as e:
-        logging.error(f"Error syncing data with KPImon: {str(e)}")
-        return jsonify(message=f"Error: {str(e)}"), 500
+    sync_requested.set()
+    logging.info("Data synchronization with KPImon initiated successfully")
+    return jsonify(message="Data synchronization with KPImon initiated successfully"), 202
 
 @ts_app.route('/rmr_health_check', methods=['POST'])
 def run_rmr_health_check():
@@ -100,8 +93,7 @@ def run_e2_health_check():
     except Exception as e:
         logging.error(f"Error executing E2 Health Check: {str(e)}")
         return jsonify(message=f"Error: {str(e)}"), 500        
-        
-a1_health_check = A1HealthCheck(rmr_xapp)
+
 @ts_app.route('/a1_health_check', methods=['POST'])
 def run_a1_health_check():
     print("A1 health check endpoint called")
@@ -125,28 +117,71 @@ def run_traffic_steering():
         logging.error(f"Error executing Traffic Steering: {str(e)}")
         return jsonify(message=f"Error: {str(e)}"), 500
 
-# Store the subprocess reference
-try:
-    logging.debug("Attempting to start the dashboard subprocess...")
-    dashboard_process = subprocess.Popen(
-        ["python3", "/app/ts-xapp/src/dashboard.py"],
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
-    logging.debug("Dashboard subprocess started successfully.")
-except Exception as e:
-    logging.error(f"Failed to start the dashboard subprocess: {str(e)}")
-
 # Define the signal handler function
 def terminate_process(signum, frame):
-    dashboard_process.terminate()
-    logging.info("Dashboard subprocess terminated.")
+    sync_stop.set()
+    if sync_thread.is_alive():
+        sync_thread.join(timeout=5)
+    # The dashboard may have failed to start or already been stopped by an earlier signal
+    if dashboard_process is not None and dashboard_process.poll() is None:
+        dashboard_process.terminate()
+        logging.info("Dashboard subprocess terminated.")
     exit(0)
 
-# Attach the handler to SIGINT (Ctrl+C) and SIGTERM (termination signal)
-signal.signal(signal.SIGINT, terminate_process)
-signal.signal(signal.SIGTERM, terminate_process)
+def main():
+    global rmr_xapp, a1_policy_manager, a1_policy_handler, a1_health_check, subscription_manager, dashboard_process
+
+    # Initialize the app and set environment variables
+    init_app()
+
+    # Set up logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s:%(levelname)s:%(message)s',
+        handlers=[
+            logging.FileHandler('ts-xapp.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    # Create an RMR xApp instance
+    rmr_xapp = RMRXapp(default_handler.default_rmr_handler, rmr_port=int(os.environ.get("RMR_PORT", 4560)))
+
+    # Initialize A1PolicyManager and A1PolicyHandler
+    a1_policy_manager = A1PolicyManager(rmr_xapp)
+    a1_policy_handler = A1PolicyHandler(rmr_xapp)
+    # Initialize the A1 health check handler
+    a1_health_check = A1HealthCheck(rmr_xapp)
+    # Startup A1PolicyManager
+    a1_policy_manager.startup()
+
+    # Provide the correct URI for the Subscription Manager
+    subscription_manager_uri = "http://10.244.0.18:3800/"
+
+    # Create an instance of the SubscriptionManager
+    subscription_manager = SubscriptionManager(uri=subscription_manager_uri, local_address="0.0.0.0", local_port=8088)
+
+    # Set the SubscriptionManager in default_handler
+    default_handler.set_subscription_manager(subscription_manager)
+
+    # Start the KPImon sync worker
+    sync_thread.start()
+
+    # Store the subprocess reference
+    try:
+        logging.debug("Attempting to start the dashboard subprocess...")
+        dashboard_process = subprocess.Popen(
+            ["python3", "/app/ts-xapp/src/dashboard.py"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        logging.debug("Dashboard subprocess started successfully.")
+    except Exception as e:
+        logging.error(f"Failed to start the dashboard subprocess: {str(e)}")
+
+    # Attach the handler to SIGINT (Ctrl+C) and SIGTERM (termination signal)
+    signal.signal(signal.SIGINT, terminate_process)
+    signal.signal(signal.SIGTERM, terminate_process)
 
-if __name__ == "__main__":
     # Log a startup message
     logging.info("ts-xApp starting...")
 
@@ -166,5 +201,8 @@ if __name__ == "__main__":
     except Exception as e:
         logging.error(f"Error initiating data synchronization from KPImon: {str(e)}")
 
-    # Start the Flask app
-    ts_app.run(host='0.0.0.0', port=5000)  # go to http://127.0.0.1:5001 in your browser
+    # Start the Flask app on a multi-threaded WSGI server instead of the Werkzeug development server
+    serve(ts_app, host='0.0.0.0', port=5000, threads=int(os.environ.get("TS_XAPP_HTTP_THREADS", 8)))  # go to http://127.0.0.1:5001 in your browser
+
+if __name__ == "__main__":
+    main()